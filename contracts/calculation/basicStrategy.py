@@ -4,14 +4,20 @@
 # =====================================================
 from matplotlib.backends.backend_pdf import PdfPages
 from datetime import datetime
+import copy
+import glob
 import io
 import math
+import pickle
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import numpy as np
-from dataclasses import dataclass
-from typing import Dict, List
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Optional, Tuple
+
+from simExport import export_simulation
+from simRisk import path_risk_metrics
 
 # ---------------------------
 # Visual style
@@ -45,10 +51,70 @@ class StrategySpec:
     min_debt_per_harvest: int = 0
     max_debt_per_harvest: int = 10_000_000
 
+@dataclass
+class VaultSimState:
+    """
+    Everything needed to continue a compounding simulation: balances, idle,
+    locked profit, RNG and the timeline accumulated so far. The last row of
+    `rows` is the snapshot of the (not yet simulated) current period.
+    """
+    CHECKPOINT_VERSION = 2
+
+    period: int
+    periods_per_year: int
+    initial_vault_assets: float
+    initial_idle_ratio: float
+    seed: int
+    total_assets: float
+    idle: float
+    deployed: float
+    locked_profit: float
+    strat_balances: Dict[str, float]
+    rng: np.random.RandomState
+    rows: List[dict] = field(default_factory=list)
+
 @dataclass
 class VaultSimResult:
     timeline: pd.DataFrame  # rows: period steps with columns for metrics
     summary: Dict[str, float] # aggregated metrics
+    state: Optional[VaultSimState] = None  # end-of-run state, for checkpoint/resume
+
+
+@dataclass
+class FleetVaultSpec:
+    """One Registry entry: a vault for `token` allocating to shared strategies."""
+    name: str
+    token: str
+    initial_assets: float
+    allocations: Dict[str, int]  # shared strategy name -> debt ratio (bps)
+    idle_ratio: float = 0.0
+    performance_fee_bps: int = VaultConstants.PERFORMANCE_FEE_BPS
+    management_fee_bps: int = VaultConstants.MANAGEMENT_FEE_BPS
+    tag: str = ''
+
+@dataclass
+class HealthCheckSpec:
+    """CommonHealthCheck limits in bps of the strategy's totalDebt (defaults match the contract)."""
+    profit_limit_ratio: int = 300
+    loss_limit_ratio: int = 100
+    strategy_limits: Dict[str, Tuple[int, int]] = field(default_factory=dict)  # name -> (profit, loss), like setStrategyLimits
+    bypass_after: Optional[int] = None  # consecutive rejections before management runs one harvest with doHealthCheck = False
+
+@dataclass
+class BaseFeeSpec:
+    """CommonFeeOracle gating: harvests wait while the base fee is above max_acceptable_gwei."""
+    max_acceptable_gwei: float
+    median_gwei: float = 20.0
+    sigma: float = 0.6        # volatility of log base fee
+    persistence: float = 0.8  # AR(1) coefficient of log base fee between periods
+    strategies: Optional[List[str]] = None  # strategies with the oracle set (None = all)
+
+@dataclass
+class FleetSimResult:
+    vaults: pd.DataFrame      # one row per vault, aggregated over paths
+    strategies: pd.DataFrame  # one row per shared strategy (exposure / loss attribution)
+    timeline: pd.DataFrame    # protocol-wide per-period aggregates (mean over paths)
+    summary: Dict[str, float] # protocol-wide metrics
 
 
 # ---------------------------
@@ -85,72 +151,457 @@ class FeeCalculator:
             'total_fee': int(total_fee)
         }
 
+# ---------------------------
+# Depositor share ledger (mirrors UnifiedVault share accounting)
+# ---------------------------
+_INT64_LIMIT = 2**63
+
+
+def _mul_div(values, num, den):
+    """
+    floor(values * num / den) elementwise with exact integer math (uint256-like).
+    Falls back to Python ints when the int64 product could overflow.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    if den <= 0:
+        raise ZeroDivisionError("mul_div denominator must be positive")
+    if values.size == 0 or num == 0:
+        return np.zeros_like(values)
+    peak = int(values.max())
+    if peak * num < _INT64_LIMIT and den < _INT64_LIMIT:
+        return values * np.int64(num) // np.int64(den)
+    return (values.astype(object) * num // den).astype(np.int64)
+
+
+def _exact_sum(values) -> int:
+    """Sum of a non-negative int64 array as a Python int (no silent overflow)."""
+    if values.size == 0:
+        return 0
+    if int(values.max()) * values.size < _INT64_LIMIT:
+        return int(values.sum())
+    return int(values.sum(dtype=object))
+
+
+def _queue_takes(requested, bounds):
+    """
+    Split consecutive requests across liquidity segments consumed in order
+    (idle, then the withdrawal queue). Returns one int64 array per segment.
+    Cumulative positions fall back to Python ints when they could overflow.
+    """
+    total = _exact_sum(requested)
+    end = np.cumsum(requested if total < _INT64_LIMIT else requested.astype(object))
+    start = end - requested
+    takes = []
+    lo = 0
+    for seg_size in bounds:
+        hi = lo + seg_size
+        # segment edges past the batch total behave like the total itself
+        take = np.minimum(end, min(hi, total)) - np.maximum(start, min(lo, total))
+        takes.append(np.maximum(take, 0).astype(np.int64))
+        lo = hi
+    return takes
+
+
+class ShareLedger:
+    """
+    Array-backed depositor ledger for batched deposit / withdraw flows.
+
+    Per-depositor state is four flat arrays (shares, deposited, withdrawn as
+    int64 and cohort as int32: 28 bytes per depositor). Vault totals are Python
+    ints, so share math is exact like the contract:
+      - deposit:  _issueSharesForAmount  -> shares = amount * totalSupply // freeFunds
+      - value:    _shareValue            -> shares * freeFunds // totalSupply
+      - withdraw: withdraw(assets, recipient, maxLoss) walking the withdrawal queue
+      - report:   _reportLoss + _assessFees (fee shares minted) + lockedProfit update
+
+    Amounts are integer token units at whatever precision the caller picks;
+    individual balances must fit int64 (vault totals may not). Deposits and the
+    loss-free part of a withdraw batch are priced at the vault state at the
+    start of the batch; the contract reprices after every call, which without
+    losses only moves results by rounding. A withdrawal loss reprices every
+    later withdrawer (and can make a later full-balance withdraw revert), so
+    from the first lossy event on a batch is replayed call by call.
+    """
+
+    def __init__(
+        self,
+        n_depositors: int,
+        strategies: List[StrategySpec],
+        cohorts=None,
+        withdraw_loss_bps: Optional[Dict[str, int]] = None,
+        vault_performance_fee_bps: int = VaultConstants.PERFORMANCE_FEE_BPS,
+        vault_management_fee_bps: int = VaultConstants.MANAGEMENT_FEE_BPS,
+        locked_profit_degradation: int = (VaultConstants.DEGRADATION_COEFFICIENT * 46) // 10**6,
+    ):
+        if len(strategies) > VaultConstants.MAXIMUM_STRATEGIES:
+            raise ValueError(f"At most {VaultConstants.MAXIMUM_STRATEGIES} strategies fit the withdrawal queue")
+
+        self.strategies = list(strategies)  # withdrawal queue order
+        self.shares = np.zeros(n_depositors, dtype=np.int64)
+        self.deposited = np.zeros(n_depositors, dtype=np.int64)
+        self.withdrawn = np.zeros(n_depositors, dtype=np.int64)
+        if cohorts is None:
+            self.cohort = np.zeros(n_depositors, dtype=np.int32)
+        else:
+            self.cohort = np.asarray(cohorts, dtype=np.int32)
+            if self.cohort.shape != (n_depositors,):
+                raise ValueError("cohorts must have one entry per depositor")
+        self.n_cohorts = int(self.cohort.max()) + 1 if n_depositors else 1
+
+        # vault-level accounting (exact ints)
+        self.total_supply = 0
+        self.total_idle = 0
+        self.strategy_debt = [0] * len(self.strategies)
+        self.strategy_debt_ratio = [s.debt_ratio_bps for s in self.strategies]
+        self.debt_ratio = sum(self.strategy_debt_ratio)
+        self.withdraw_loss_bps = [(withdraw_loss_bps or {}).get(s.name, 0) for s in self.strategies]
+        self.vault_performance_fee_bps = vault_performance_fee_bps
+        self.vault_management_fee_bps = vault_management_fee_bps
+        self.locked_profit = 0
+        self.locked_profit_degradation = locked_profit_degradation
+        self.seconds_since_report = 0
+        self.fee_shares = 0  # shares minted to rewards + strategists
+
+        # per-cohort accumulators
+        self.cohort_shares = np.zeros(self.n_cohorts, dtype=np.int64)
+        self.cohort_fee_dilution = np.zeros(self.n_cohorts)
+        self.cohort_withdrawal_loss = np.zeros(self.n_cohorts)
+        self.cohort_strategy_loss = np.zeros(self.n_cohorts)
+
+    # ----- views (UnifiedVault equivalents) -----
+    def total_assets(self) -> int:
+        return self.total_idle + sum(self.strategy_debt)
+
+    def calculate_locked_profit(self) -> int:
+        if self.locked_profit == 0 or self.locked_profit_degradation == 0:
+            return 0
+        locked_funds_ratio = self.seconds_since_report * self.locked_profit_degradation
+        if locked_funds_ratio < VaultConstants.DEGRADATION_COEFFICIENT:
+            return self.locked_profit - (locked_funds_ratio * self.locked_profit) // VaultConstants.DEGRADATION_COEFFICIENT
+        return 0
+
+    def free_funds(self) -> int:
+        total = self.total_assets()
+        lp = self.calculate_locked_profit()
+        return 0 if total <= lp else total - lp
+
+    def share_value(self, shares):
+        """_shareValue for an array of share amounts."""
+        shares = np.asarray(shares, dtype=np.int64)
+        if self.total_supply == 0:
+            return shares.copy()
+        ff = self.free_funds()
+        if ff == 0:
+            return np.zeros_like(shares)
+        return _mul_div(shares, ff, self.total_supply)
+
+    def shares_for_amount(self, amounts, free_funds: Optional[int] = None):
+        """_sharesForAmount for an array of asset amounts."""
+        amounts = np.asarray(amounts, dtype=np.int64)
+        ff = self.free_funds() if free_funds is None else free_funds
+        if ff > 0 and self.total_supply > 0:
+            return _mul_div(amounts, self.total_supply, ff)
+        return np.zeros_like(amounts)
+
+    def price_per_share(self, decimals: int = 18) -> int:
+        """pricePerShare(): value of one whole share."""
+        unit = 10**decimals
+        if self.total_supply == 0:
+            return unit
+        return unit * self.free_funds() // self.total_supply
+
+    # ----- flows -----
+    def deposit(self, depositors, amounts):
+        """
+        Apply a batch of deposits. Returns shares issued per event
+        (0 where the contract would revert with ZeroAmount / ZeroShares).
+        """
+        depositors = np.asarray(depositors, dtype=np.int64)
+        amounts = np.asarray(amounts, dtype=np.int64)
+        ts, ff = self.total_supply, self.free_funds()
+        if ts > 0 and ff > 0:
+            shares = _mul_div(amounts, ts, ff)
+        else:
+            # initial deposit or no free funds => 1:1
+            shares = amounts.copy()
+        shares[(amounts <= 0) | (shares <= 0)] = 0
+
+        ok = shares > 0
+        dep, amt, sh = depositors[ok], amounts[ok], shares[ok]
+        np.add.at(self.shares, dep, sh)
+        np.add.at(self.deposited, dep, amt)
+        np.add.at(self.cohort_shares, self.cohort[dep], sh)
+        self.total_supply += _exact_sum(sh)
+        self.total_idle += _exact_sum(amt)
+        return shares
+
+    def withdraw(self, depositors, assets, max_loss_bps: int = 1):
+        """
+        Apply a batch of withdraw(assets, recipient, maxLoss) calls, served from
+        idle first and then the withdrawal queue. Depositors must be unique
+        within a batch. Returns (shares_burned, value_received); both are 0 for
+        events the contract would revert (InsufficientBalance, ExcessiveLoss).
+        """
+        if max_loss_bps > VaultConstants.MAX_BPS:
+            raise ValueError("max_loss_bps cannot exceed MAX_BPS")
+        depositors = np.asarray(depositors, dtype=np.int64)
+        assets = np.asarray(assets, dtype=np.int64)
+        if np.unique(depositors).size != depositors.size:
+            raise ValueError("Depositors must be unique within a withdraw batch")
+
+        balances = self.shares[depositors]
+        shares_burned = np.zeros_like(assets)
+        value = np.zeros_like(assets)
+        loss = np.zeros_like(assets)
+
+        # loss-free prefix: priced at the batch-start share price
+        ff = self.free_funds()
+        shares_needed = self.shares_for_amount(assets, ff)
+        active = (assets > 0) & (shares_needed <= balances)
+        requested = np.where(active, assets, 0)
+        taken = _queue_takes(requested, [self.total_idle] + self.strategy_debt)
+        for take, seg_loss_bps in zip(taken[1:], self.withdraw_loss_bps):
+            if seg_loss_bps:
+                loss += _mul_div(take, seg_loss_bps, VaultConstants.MAX_BPS)
+        lossy = np.flatnonzero(loss)
+        split = int(lossy[0]) if lossy.size else assets.size
+
+        head = slice(0, split)
+        shares_burned[head] = np.where(active[head], shares_needed[head], 0)
+        value[head] = requested[head]
+        for i, take in enumerate(taken[1:]):
+            self.strategy_debt[i] -= _exact_sum(take[head])
+        self.total_idle -= _exact_sum(taken[0][head])
+        self.total_supply -= _exact_sum(shares_burned[head])
+        loss[:] = 0
+
+        # from the first lossy event on, replay calls one by one
+        for k in range(split, assets.size):
+            shares_burned[k], value[k], loss[k] = self._withdraw_one(int(assets[k]), int(balances[k]), max_loss_bps)
+
+        cohorts = self.cohort[depositors]
+        self.shares[depositors] -= shares_burned
+        self.withdrawn[depositors] += value
+        np.subtract.at(self.cohort_shares, cohorts, shares_burned)
+        self.cohort_withdrawal_loss += np.bincount(cohorts, weights=loss, minlength=self.n_cohorts)
+        return shares_burned, value
+
+    def _withdraw_one(self, assets: int, balance: int, max_loss_bps: int):
+        """One withdraw() call with exact ints; returns (shares, value, loss), zeros on revert."""
+        if assets <= 0:
+            return 0, 0, 0
+        ts, locked_profit = self.total_supply, self.calculate_locked_profit()
+        free_funds = max(self.total_assets() - locked_profit, 0)
+        shares = assets * ts // free_funds if free_funds > 0 else 0
+        if shares > balance:
+            return 0, 0, 0  # InsufficientBalance
+
+        value, vault_balance, total_loss = assets, self.total_idle, 0
+        debt = list(self.strategy_debt)
+        debt_ratios, debt_ratio = list(self.strategy_debt_ratio), self.debt_ratio
+        if value > vault_balance:
+            for i, seg_loss_bps in enumerate(self.withdraw_loss_bps):
+                if value <= vault_balance:
+                    break
+                needed = min(value - vault_balance, debt[i])
+                if needed == 0:
+                    continue
+                seg_loss = needed * seg_loss_bps // VaultConstants.MAX_BPS
+                vault_balance += needed - seg_loss
+                if seg_loss > 0:
+                    value -= seg_loss
+                    total_loss += seg_loss
+                    # _reportLoss
+                    total_debt = sum(debt)
+                    if debt_ratio != 0 and total_debt > 0:
+                        ratio_change = min(seg_loss * debt_ratio // total_debt, debt_ratios[i])
+                        debt_ratios[i] -= ratio_change
+                        debt_ratio -= ratio_change
+                debt[i] -= needed
+            value = min(value, vault_balance)
+            if total_loss > (max_loss_bps * value) // VaultConstants.MAX_BPS:
+                return 0, 0, 0  # ExcessiveLoss
+
+            # shares are repriced after this call's own losses
+            free_funds = max(vault_balance + sum(debt) - locked_profit, 0)
+            shares = value * ts // free_funds if free_funds > 0 else 0
+            if shares > balance:
+                return 0, 0, 0  # balanceOf underflow
+
+        self.strategy_debt, self.strategy_debt_ratio, self.debt_ratio = debt, debt_ratios, debt_ratio
+        self.total_idle = vault_balance - value
+        self.total_supply -= shares
+        return shares, value, total_loss
+
+    def rebalance(self):
+        """Move idle into strategies up to their debt ratios (harvest credit, simplified)."""
+        total = self.total_assets()
+        for i, ratio in enumerate(self.strategy_debt_ratio):
+            target = total * ratio // VaultConstants.MAX_BPS
+            move = min(max(target - self.strategy_debt[i], 0), self.total_idle)
+            self.strategy_debt[i] += move
+            self.total_idle -= move
+
+    def report(self, gains, losses, duration_seconds: int):
+        """
+        Advance time by `duration_seconds` and report every strategy (queue
+        order) with integer gains/losses: _reportLoss, _assessFees (fee shares
+        minted to rewards/strategist), gain to idle and lockedProfit update.
+        Returns the total fee (asset units) charged.
+        """
+        self.seconds_since_report += duration_seconds
+        total_fees = 0
+        for i, s in enumerate(self.strategies):
+            gain, loss = int(gains[i]), int(losses[i])
+            if loss > 0:
+                if loss > self.strategy_debt[i]:
+                    raise ValueError(f"Loss on {s.name} exceeds its debt")
+                self._reduce_debt_ratio(i, loss, sum(self.strategy_debt))
+                if self.total_supply:
+                    self.cohort_strategy_loss += self.cohort_shares * (loss / self.total_supply)
+                self.strategy_debt[i] -= loss
+
+            fee = 0
+            if gain > 0:
+                fee = FeeCalculator.assess_fees(
+                    gain=gain,
+                    strategy_debt=self.strategy_debt[i],
+                    delegated_assets=0,
+                    duration_seconds=duration_seconds,
+                    strategy_performance_fee_bps=s.perf_fee_bps,
+                    vault_performance_fee_bps=self.vault_performance_fee_bps,
+                    vault_management_fee_bps=self.vault_management_fee_bps,
+                )['total_fee']
+            if fee > 0:
+                ts, ff = self.total_supply, self.free_funds()
+                reward_shares = (fee * ts) // ff if ts > 0 and ff > 0 else fee
+                if ts:
+                    self.cohort_fee_dilution += self.cohort_shares * (fee / ts)
+                self.total_supply += reward_shares
+                self.fee_shares += reward_shares
+                total_fees += fee
+
+            self.total_idle += gain
+            locked_before_loss = self.calculate_locked_profit() + (gain - fee)
+            self.locked_profit = locked_before_loss - loss if locked_before_loss > loss else 0
+            self.seconds_since_report = 0
+        return total_fees
+
+    def _reduce_debt_ratio(self, i: int, loss: int, total_debt: int):
+        if self.debt_ratio != 0 and total_debt > 0:
+            ratio_change = min(loss * self.debt_ratio // total_debt, self.strategy_debt_ratio[i])
+            self.strategy_debt_ratio[i] -= ratio_change
+            self.debt_ratio -= ratio_change
+
+    # ----- reporting -----
+    def cohort_report(self) -> pd.DataFrame:
+        """Per-cohort PnL with fee-share dilution and loss attribution (asset units)."""
+        n = self.n_cohorts
+        value = self.share_value(self.shares)
+        deposited = np.bincount(self.cohort, weights=self.deposited, minlength=n)
+        withdrawn = np.bincount(self.cohort, weights=self.withdrawn, minlength=n)
+        current_value = np.bincount(self.cohort, weights=value, minlength=n)
+        return pd.DataFrame({
+            'cohort': np.arange(n),
+            'depositors': np.bincount(self.cohort, minlength=n),
+            'shares': self.cohort_shares,
+            'deposited': deposited,
+            'withdrawn': withdrawn,
+            'current_value': current_value,
+            'pnl': withdrawn + current_value - deposited,
+            'fee_dilution': self.cohort_fee_dilution,
+            'withdrawal_loss': self.cohort_withdrawal_loss,
+            'strategy_loss': self.cohort_strategy_loss,
+        })
+
 # ---------------------------
 # Simulation functions
 # ---------------------------
-def simulate_strategies_compounding(
+def init_vault_state(
     strategies: List[StrategySpec],
     initial_vault_assets: float = 10_000_000,
     initial_idle_ratio: float = 0.30,
-    years: int = 20,
     periods_per_year: int = 12,
-    vault_performance_fee_bps: int = VaultConstants.PERFORMANCE_FEE_BPS,
-    vault_management_fee_bps: int = VaultConstants.MANAGEMENT_FEE_BPS,
     seed: int = 42,
-):
+) -> VaultSimState:
     """
-    Simulate multiple strategies and the vault over time.
-    Returns per-period DataFrame with columns:
-    - period_idx, year_step, total_assets_gross, total_assets_net,
-      total_fees_paid, per-strategy balances/gains/fees, idle, deployed
+    Build the period-0 simulator state and record its opening snapshot.
     """
-    np.random.seed(seed)
-
-    periods = years * periods_per_year
-    dt_year_fraction = 1.0 / periods_per_year
-    dt_seconds = int(VaultConstants.SECS_PER_YEAR / periods_per_year)
-
     # initial allocation by debt ratios
     total_debt_ratio = sum(s.debt_ratio_bps for s in strategies)
     if total_debt_ratio == 0:
         raise ValueError("At least one strategy must have non-zero debt ratio")
 
     # initial values
-    total_assets = initial_vault_assets
-    locked_profit = 0
     idle = initial_vault_assets * initial_idle_ratio
     deployed = initial_vault_assets - idle
-    shares_total = initial_vault_assets  # treat shares ~ token units for simpler sim
-
-    # Prepare DataFrame rows
-    rows = []
-    # track per-strategy principal
-    strat_balances = {s.name: deployed * (s.debt_ratio_bps / total_debt_ratio) for s in strategies}
-
-    for step in range(periods + 1):
-        year = step / periods_per_year
-        # record state at beginning of period
-        row = {
-            'period': step,
-            'year': year,
-            'total_assets_gross': total_assets,
-            'idle': idle,
-            'deployed': deployed,
-            'locked_profit': locked_profit,
-        }
-        # initialize per-strategy columns
-        for s in strategies:
-            row[f'{s.name}_balance'] = strat_balances[s.name]
-            row[f'{s.name}_gain'] = 0.0
-            row[f'{s.name}_fee'] = 0.0
-            row[f'{s.name}_net_gain'] = 0.0
 
-        row['total_fees'] = 0.0
-        rows.append(row)
+    state = VaultSimState(
+        period=0,
+        periods_per_year=periods_per_year,
+        initial_vault_assets=initial_vault_assets,
+        initial_idle_ratio=initial_idle_ratio,
+        seed=seed,
+        total_assets=initial_vault_assets,
+        idle=idle,
+        deployed=deployed,
+        locked_profit=0,
+        # track per-strategy principal
+        strat_balances={s.name: deployed * (s.debt_ratio_bps / total_debt_ratio) for s in strategies},
+        rng=np.random.RandomState(seed),
+    )
+    _record_period_snapshot(state, strategies)
+    return state
+
+
+def _record_period_snapshot(state: VaultSimState, strategies: List[StrategySpec]):
+    # record state at beginning of period
+    row = {
+        'period': state.period,
+        'year': state.period / state.periods_per_year,
+        'total_assets_gross': state.total_assets,
+        'idle': state.idle,
+        'deployed': state.deployed,
+        'locked_profit': state.locked_profit,
+    }
+    # initialize per-strategy columns
+    for s in strategies:
+        row[f'{s.name}_balance'] = state.strat_balances[s.name]
+        row[f'{s.name}_gain'] = 0.0
+        row[f'{s.name}_fee'] = 0.0
+        row[f'{s.name}_net_gain'] = 0.0
+
+    row['total_fees'] = 0.0
+    state.rows.append(row)
+
+
+def advance_vault_state(
+    state: VaultSimState,
+    strategies: List[StrategySpec],
+    periods: int,
+    vault_performance_fee_bps: int = VaultConstants.PERFORMANCE_FEE_BPS,
+    vault_management_fee_bps: int = VaultConstants.MANAGEMENT_FEE_BPS,
+) -> VaultSimState:
+    """
+    Simulate `periods` more periods on top of `state` (mutated in place).
+    Strategy names must be exactly the ones the state was built with; fees and
+    per-strategy return/fee parameters may differ (what-if branches).
+    """
+    names = [s.name for s in strategies]
+    unknown = [name for name in names if name not in state.strat_balances]
+    missing = [name for name in state.strat_balances if name not in names]
+    if unknown or missing or len(names) != len(set(names)):
+        raise ValueError(
+            f"Strategies must match the state exactly: unknown {unknown}, missing {missing}"
+            + (", duplicate names given" if len(names) != len(set(names)) else "")
+        )
 
-        if step == periods:
-            break  # final snapshot only; don't simulate beyond last recording
+    periods_per_year = state.periods_per_year
+    dt_year_fraction = 1.0 / periods_per_year
+    dt_seconds = int(VaultConstants.SECS_PER_YEAR / periods_per_year)
+    strat_balances = state.strat_balances
 
+    for _ in range(periods):
         # Simulate one period of returns for each strategy (annualized mean/std -> period random draw)
         gross_period_gains = {}
         fee_periods = {}
@@ -162,7 +613,7 @@ def simulate_strategies_compounding(
             # we simulate simple lognormal-ish returns via normal on return rate
             mu = s.mean_annual_return
             sigma = s.std_annual_return
-            period_return = np.random.normal(loc=mu * dt_year_fraction, scale=sigma * math.sqrt(dt_year_fraction))
+            period_return = state.rng.normal(loc=mu * dt_year_fraction, scale=sigma * math.sqrt(dt_year_fraction))
             gross_gain = balance * period_return
             # ensure realistic lower bound (can't lose more than balance in this period in our simple model)
             gross_gain = max(gross_gain, -0.99 * balance)
@@ -196,38 +647,51 @@ def simulate_strategies_compounding(
 
         # Recompute deployed and idle (we assume idle remains a fraction unless gains push overall assets)
         deployed = sum(strat_balances.values())
-        total_assets = deployed + idle
+        total_assets = deployed + state.idle
         # locked profit: for simplicity, set to fraction of last period gains (mirroring vault lock)
-        locked_profit = max(0.0, 0.0 + total_gross_gain * 0.5)  # simple model: 50% initially locked and decays each period in view
+        state.locked_profit = max(0.0, 0.0 + total_gross_gain * 0.5)  # simple model: 50% initially locked and decays each period in view
         # total fees are removed from vault (i.e., reduce assets net)
         total_assets -= total_fees
 
         # update variables for next iteration
         total_assets = max(total_assets, 0.0)
         # distribute idle proportionally if vault grew large (keep idle ratio constant for simplicity)
-        target_idle = initial_vault_assets * initial_idle_ratio
+        target_idle = state.initial_vault_assets * state.initial_idle_ratio
         # keep idle stable (you could also model flows)
-        idle = target_idle
-        deployed = total_assets - idle
-        deployed = max(deployed, 0.0)
+        state.idle = target_idle
+        deployed = total_assets - state.idle
+        state.deployed = max(deployed, 0.0)
 
         # update total_assets for next step
-        total_assets = idle + deployed
+        state.total_assets = state.idle + state.deployed
 
-        # update row values for this step (the next iteration will record the new state)
-        # but also update the rows[-1] (current row) with actual gain/fee numbers for the period we just simulated
-        rows[-1].update({
+        # update the open row (beginning of this period) with actual gain/fee numbers for the period we just simulated
+        state.rows[-1].update({
             'total_gross_gain': total_gross_gain,
             'total_fees': total_fees,
             'total_net_gain': total_gross_gain - total_fees,
         })
         for s in strategies:
-            rows[-1][f'{s.name}_gain'] = gross_period_gains[s.name]
-            rows[-1][f'{s.name}_fee'] = fee_periods[s.name]
-            rows[-1][f'{s.name}_net_gain'] = net_period_gains[s.name]
+            state.rows[-1][f'{s.name}_gain'] = gross_period_gains[s.name]
+            state.rows[-1][f'{s.name}_fee'] = fee_periods[s.name]
+            state.rows[-1][f'{s.name}_net_gain'] = net_period_gains[s.name]
+
+        # the next period starts from the new state
+        state.period += 1
+        _record_period_snapshot(state, strategies)
+
+    return state
+
+
+def build_vault_result(state: VaultSimState, strategies: List[StrategySpec]) -> VaultSimResult:
+    """
+    Turn the accumulated timeline of `state` into a VaultSimResult.
+    The returned result carries the state so it can be checkpointed or resumed.
+    """
+    periods_per_year = state.periods_per_year
 
     # Build DataFrame
-    df = pd.DataFrame(rows).fillna(0.0)
+    df = pd.DataFrame(state.rows).fillna(0.0)
 
     # Derived metrics
     df['cumulative_gross_gain'] = df[[f'{s.name}_gain' for s in strategies]].sum(axis=1).cumsum()
@@ -239,7 +703,7 @@ def simulate_strategies_compounding(
     total_fees_paid = df['cumulative_fees'].iloc[-1]
     final_value_gross = df['total_assets_gross'].iloc[-1] + df['cumulative_gross_gain'].iloc[-1]
     final_value_net = df['vault_value'].iloc[-1]
-    period_returns = df['total_net_gain'].replace(0, np.nan).dropna()  # per period net gains
+    period_returns = df['total_net_gain'].replace(0, np.nan).dropna() if 'total_net_gain' in df else pd.Series(dtype=float)  # per period net gains
     avg_period_return = period_returns.mean() if not period_returns.empty else 0.0
     std_period_return = period_returns.std(ddof=0) if not period_returns.empty else 0.0
     # Sharpe-like ratio (per period) — for demonstration use period mean / std
@@ -265,7 +729,454 @@ def simulate_strategies_compounding(
         'sharpe_annual_est': float(sharpe_annual) if not np.isnan(sharpe_annual) else None
     }
 
-    return VaultSimResult(timeline=df, summary=summary)
+    # Path-wise risk on period net returns (30-day loss window, 1-year rolling Sharpe)
+    if 'total_net_gain' in df:
+        opening_assets = df['total_assets_gross'].iloc[:-1].replace(0, np.nan)
+        net_returns = (df['total_net_gain'].iloc[:-1] / opening_assets).fillna(0.0).to_numpy()
+        risk = path_risk_metrics(
+            net_returns,
+            loss_window=max(1, round(30 * periods_per_year / 365)),
+            sharpe_window=periods_per_year,
+            periods_per_year=periods_per_year,
+        )
+        for key, name in [('max_drawdown', 'max_drawdown'),
+                          ('time_under_water', 'time_under_water_periods'),
+                          ('longest_under_water', 'longest_under_water_periods'),
+                          ('worst_window_loss', 'worst_30d_loss'),
+                          ('rolling_sharpe_min', 'rolling_sharpe_min'),
+                          ('rolling_sharpe_mean', 'rolling_sharpe_mean')]:
+            value = float(risk[key][0])
+            summary[name] = value if not np.isnan(value) else None
+
+    return VaultSimResult(timeline=df, summary=summary, state=state)
+
+
+def simulate_strategies_compounding(
+    strategies: List[StrategySpec],
+    initial_vault_assets: float = 10_000_000,
+    initial_idle_ratio: float = 0.30,
+    years: int = 20,
+    periods_per_year: int = 12,
+    vault_performance_fee_bps: int = VaultConstants.PERFORMANCE_FEE_BPS,
+    vault_management_fee_bps: int = VaultConstants.MANAGEMENT_FEE_BPS,
+    seed: int = 42,
+    resume_from: Optional[VaultSimState] = None,
+):
+    """
+    Simulate multiple strategies and the vault over time.
+    Returns per-period DataFrame with columns:
+    - period_idx, year_step, total_assets_gross, total_assets_net,
+      total_fees_paid, per-strategy balances/gains/fees, idle, deployed
+
+    `years` is the total horizon. With `resume_from` (e.g. `result.state` or a
+    loaded checkpoint) only the periods past the checkpoint are simulated;
+    the checkpoint itself is forked, so many scenarios can branch from it.
+    initial_vault_assets / initial_idle_ratio / periods_per_year / seed are
+    taken from the checkpoint in that case.
+    """
+    if resume_from is None:
+        state = init_vault_state(strategies, initial_vault_assets, initial_idle_ratio, periods_per_year, seed)
+    else:
+        state = fork_vault_state(resume_from)
+
+    periods = years * state.periods_per_year - state.period
+    if periods < 0:
+        raise ValueError(f"Checkpoint is already at period {state.period}, past the requested {years} year horizon")
+
+    advance_vault_state(state, strategies, periods, vault_performance_fee_bps, vault_management_fee_bps)
+    return build_vault_result(state, strategies)
+
+# ---------------------------
+# Checkpoint / resume
+# ---------------------------
+def fork_vault_state(state: VaultSimState) -> VaultSimState:
+    """Independent copy of `state` (balances, RNG, timeline) to branch a scenario from."""
+    return copy.deepcopy(state)
+
+
+def save_vault_checkpoint(state: VaultSimState, path: str):
+    """
+    Persist the full simulator state (including RNG and timeline) to `path`.
+    Written as plain data (field dict, rng.get_state(), rows) so loading never
+    depends on the module the state class was defined in (e.g. __main__).
+    """
+    data = {f.name: getattr(state, f.name) for f in fields(state) if f.name != 'rng'}
+    payload = {
+        'version': VaultSimState.CHECKPOINT_VERSION,
+        'fields': copy.deepcopy(data),
+        'rng_state': state.rng.get_state(),
+    }
+    with open(path, 'wb') as fh:
+        pickle.dump(payload, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def load_vault_checkpoint(path: str) -> VaultSimState:
+    """Load a state written by save_vault_checkpoint."""
+    with open(path, 'rb') as fh:
+        payload = pickle.load(fh)
+    if payload.get('version') != VaultSimState.CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {payload.get('version')}")
+    rng = np.random.RandomState()
+    rng.set_state(payload['rng_state'])
+    return VaultSimState(rng=rng, **payload['fields'])
+
+# ---------------------------
+# Export (Arrow / Parquet / memory-mapped npy)
+# ---------------------------
+def export_vault_result(result: VaultSimResult, strategies: List[StrategySpec], path: str, format: str = 'npy', **parameters):
+    """
+    Export the timeline and summary of a compounding run with its strategy specs,
+    seed and parameters as schema metadata. Reload lazily with simExport.load_simulation.
+    """
+    metadata = {
+        'kind': 'vault_compounding',
+        'strategies': strategies,
+        'parameters': parameters,
+    }
+    if result.state is not None:
+        metadata.update({
+            'seed': result.state.seed,
+            'periods': result.state.period,
+            'periods_per_year': result.state.periods_per_year,
+            'initial_vault_assets': result.state.initial_vault_assets,
+            'initial_idle_ratio': result.state.initial_idle_ratio,
+        })
+    return export_simulation(path, tables={'timeline': result.timeline}, metrics=result.summary,
+                             metadata=metadata, format=format)
+
+# ---------------------------
+# Fleet simulation (Registry-wide, shared strategy draws)
+# ---------------------------
+def fleet_from_registry(registry: Dict[str, List[dict]]) -> List[FleetVaultSpec]:
+    """
+    Build vault specs from a Registry-like description: token -> list of vault
+    entries (in `vaults[token][id]` order), each a dict of FleetVaultSpec fields
+    except `token`. Unnamed vaults get `<token>-<id>`.
+    """
+    vaults = []
+    for token, entries in registry.items():
+        for vault_id, entry in enumerate(entries):
+            entry = dict(entry)
+            entry.setdefault('name', f'{token}-{vault_id}')
+            vaults.append(FleetVaultSpec(token=token, **entry))
+    return vaults
+
+
+def simulate_fleet(
+    strategies: List[StrategySpec],
+    vaults: List[FleetVaultSpec],
+    years: int = 20,
+    periods_per_year: int = 12,
+    n_paths: int = 1000,
+    strategy_correlation: Optional[np.ndarray] = None,
+    seed: int = 42,
+    health_check: Optional[HealthCheckSpec] = None,
+    base_fee: Optional[BaseFeeSpec] = None,
+) -> FleetSimResult:
+    """
+    Simulate every vault of a fleet together. Each shared strategy gets one
+    return draw per path and period (optionally correlated across strategies),
+    applied to every vault that allocates to it, so overlapping vaults take
+    correlated gains and losses. Harvests mirror simulate_strategies_compounding
+    (gain floor, FeeCalculator fee formulas, constant idle) plus the vault's
+    lockedProfit update, vectorized over paths and allocated (vault, strategy) pairs.
+    Management + vault performance fees accrue to the protocol; strategist fees
+    to strategists.
+
+    With `health_check` / `base_fee`, each harvest is gated by masks: a harvest
+    whose profit or loss breaks the CommonHealthCheck limits reverts (rejected),
+    one attempted while the base fee is above the oracle's maximum waits
+    (deferred). Either way nothing is reported: the P&L stays unreported in the
+    strategy, debt is unchanged, the vault's lockedProfit keeps unlocking from
+    its last report and fees (management fee over the whole time since the last
+    report) are charged on the next harvest. Only simulate_fleet gates harvests;
+    the single-vault compounding simulation reports every period. The base fee
+    has its own random stream, so gated and ungated runs with the same seed
+    share their strategy returns.
+
+    Gating cost: a period where every pair reported last time and no harvest is
+    deferred only checks each strategy's return against its limits, so runs
+    where harvests pass cost the same as ungated ones. Periods with rejected or
+    deferred harvests take the masked path, about +10% (base-fee deferrals) to
+    +30% (most harvests rejected) over ungated on 300 vaults x 5 strategies.
+    """
+    n_strategies, n_vaults = len(strategies), len(vaults)
+    index = {s.name: j for j, s in enumerate(strategies)}
+    unknown = {name for v in vaults for name in v.allocations if name not in index}
+    if unknown:
+        raise ValueError(f"Vault allocations reference unknown strategies: {sorted(unknown)}")
+
+    # vault x strategy allocation matrix (bps of each vault's deployed assets)
+    ratios = np.zeros((n_vaults, n_strategies))
+    for i, v in enumerate(vaults):
+        for name, bps in v.allocations.items():
+            ratios[i, index[name]] = bps
+    totals = ratios.sum(axis=1)
+    if (totals == 0).any():
+        raise ValueError("Every vault needs at least one strategy with non-zero debt ratio")
+
+    # only allocated (vault, strategy) pairs are simulated, grouped by vault;
+    # per-vault totals are segment sums, per-strategy totals a one-hot product
+    pair_vault, pair_strategy = np.nonzero(ratios)
+    n_pairs = pair_vault.size
+    vault_starts = np.flatnonzero(np.r_[True, pair_vault[1:] != pair_vault[:-1]])
+    strategy_onehot = np.zeros((n_pairs, n_strategies))
+    strategy_onehot[np.arange(n_pairs), pair_strategy] = 1.0
+
+    def per_vault(values):
+        return np.add.reduceat(values, vault_starts, axis=1)
+
+    def per_strategy(values):
+        return values @ strategy_onehot
+
+    initial_assets = np.array([v.initial_assets for v in vaults], dtype=float)
+    idle = initial_assets * np.array([v.idle_ratio for v in vaults])
+    debt = np.broadcast_to(((initial_assets - idle) / totals)[pair_vault] * ratios[pair_vault, pair_strategy],
+                           (n_paths, n_pairs)).copy()  # reported (vault totalDebt)
+    assets = debt.copy()  # what the strategies actually hold
+    locked_profit = np.zeros((n_paths, n_vaults))  # as of each vault's last report
+    vault_periods_since_report = np.zeros((n_paths, n_vaults), dtype=np.int32)
+
+    periods = years * periods_per_year
+    dt_year_fraction = 1.0 / periods_per_year
+    dt_seconds = int(VaultConstants.SECS_PER_YEAR / periods_per_year)
+    degradation = (VaultConstants.DEGRADATION_COEFFICIENT * 46) // 10**6
+    unlocked_per_period = dt_seconds * degradation / VaultConstants.DEGRADATION_COEFFICIENT
+
+    mu = np.array([s.mean_annual_return for s in strategies]) * dt_year_fraction
+    sigma = np.array([s.std_annual_return for s in strategies]) * math.sqrt(dt_year_fraction)
+    chol = np.linalg.cholesky(strategy_correlation) if strategy_correlation is not None else np.eye(n_strategies)
+    strategist_bps = np.array([s.perf_fee_bps for s in strategies], dtype=float)[pair_strategy]
+    vault_perf_bps = np.array([v.performance_fee_bps for v in vaults], dtype=float)[pair_vault]
+    mgmt_rate = np.array([v.management_fee_bps for v in vaults], dtype=float)[pair_vault] * dt_seconds \
+        / (VaultConstants.MAX_BPS * VaultConstants.SECS_PER_YEAR)
+
+    # harvest gating tables (health-check limits as per-strategy rates of the reported debt)
+    gated = health_check is not None or base_fee is not None
+    if health_check is not None:
+        profit_rate = np.array([health_check.strategy_limits.get(s.name, (health_check.profit_limit_ratio, 0))[0]
+                                for s in strategies], dtype=float) / VaultConstants.MAX_BPS
+        loss_rate = np.array([health_check.strategy_limits.get(s.name, (0, health_check.loss_limit_ratio))[1]
+                              for s in strategies], dtype=float) / VaultConstants.MAX_BPS
+        used_strategies = np.unique(pair_strategy)
+        pair_profit_rate, pair_loss_rate = profit_rate[pair_strategy], loss_rate[pair_strategy]
+    uses_oracle = np.zeros(n_pairs, dtype=bool)
+    if base_fee is not None:
+        oracle_names = [s.name for s in strategies] if base_fee.strategies is None else base_fee.strategies
+        uses_oracle = np.array([s.name in oracle_names for s in strategies])[pair_strategy]
+        log_median = math.log(base_fee.median_gwei)
+        log_base_fee = np.full(n_paths, log_median)
+    deferred_periods = np.zeros(n_paths, dtype=np.int32)  # deferral is network-wide per path
+    harvests_rejected = np.zeros((n_paths, n_pairs), dtype=np.int32)
+    if gated:
+        periods_since_report = np.zeros((n_paths, n_pairs), dtype=np.int32)
+        consecutive_rejections = np.zeros((n_paths, n_pairs), dtype=np.int32)
+        pnl = np.empty((n_paths, n_pairs))
+        limit = np.empty((n_paths, n_pairs))
+        healthy = np.empty((n_paths, n_pairs), dtype=bool)
+        mask = np.empty((n_paths, n_pairs), dtype=bool)
+        scratch = np.empty((n_paths, n_pairs), dtype=bool)
+        all_reported = True  # every pair reported last period: pnl is just this period's gain
+
+    rng = np.random.default_rng(seed)
+    if base_fee is not None:
+        base_fee_rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0])
+    protocol_fees = np.zeros((n_paths, n_vaults))
+    strategist_fees = np.zeros((n_paths, n_vaults))
+    gross_gain = np.zeros((n_paths, n_vaults))
+    loss_periods = np.zeros((n_paths, n_vaults), dtype=np.int64)
+    worst_period = np.zeros((n_paths, n_vaults))
+    pair_losses = np.zeros((n_paths, n_pairs))
+    worst_protocol_period = np.zeros(n_paths)
+    max_vaults_in_loss = np.zeros(n_paths, dtype=np.int64)
+    timeline = np.zeros((periods + 1, 4))  # tvl, protocol fees, strategist fees, net gain (path means)
+    timeline[0, 0] = initial_assets.sum()
+
+    for t in range(periods):
+        # one shared draw per strategy (correlated), applied to every vault using it
+        period_return = mu + (rng.standard_normal((n_paths, n_strategies)) @ chol.T) * sigma
+        gain = assets * period_return[:, pair_strategy]
+        np.maximum(gain, -0.99 * assets, out=gain)
+
+        # harvest: None when every pair reports this period (no gating cost),
+        # otherwise the mask of pairs whose harvest goes through
+        harvest = None
+        if gated:
+            path_blocked = None
+            if base_fee is not None:
+                # CommonFeeOracle: AR(1) log base fee, one network-wide value per path
+                log_base_fee = log_median + base_fee.persistence * (log_base_fee - log_median) \
+                    + base_fee.sigma * math.sqrt(1 - base_fee.persistence ** 2) * base_fee_rng.standard_normal(n_paths)
+                path_blocked = np.exp(log_base_fee) > base_fee.max_acceptable_gwei
+                deferred_periods += path_blocked
+                if not (path_blocked.any() and uses_oracle.any()):
+                    path_blocked = None
+            if all_reported and path_blocked is None and health_check is not None:
+                # reported debt == assets before the gain, so the CommonHealthCheck
+                # limits reduce to bounds on each strategy's (floored) period return
+                strategy_return = np.maximum(period_return[:, used_strategies], -0.99)
+                in_limits = ((strategy_return <= profit_rate[used_strategies])
+                             & (strategy_return >= -loss_rate[used_strategies])).all()
+            else:
+                in_limits = True
+            if not (all_reported and path_blocked is None and in_limits):
+                harvest = mask
+                if debt is assets:
+                    debt = assets.copy()
+                assets += gain
+                np.subtract(assets, debt, out=pnl)  # unreported since the last successful harvest
+                periods_since_report += 1
+                if path_blocked is not None:
+                    np.logical_and(path_blocked[:, None], uses_oracle, out=harvest)
+                    np.logical_not(harvest, out=harvest)
+                else:
+                    harvest.fill(True)
+                if health_check is not None:
+                    # CommonHealthCheck._executeDefaultCheck against the reported totalDebt
+                    np.multiply(debt, pair_profit_rate, out=limit)
+                    np.less_equal(pnl, limit, out=healthy)
+                    np.multiply(debt, -pair_loss_rate, out=limit)
+                    healthy &= np.greater_equal(pnl, limit, out=scratch)
+                    if health_check.bypass_after is not None:
+                        healthy |= consecutive_rejections >= health_check.bypass_after
+                    if not healthy.all():
+                        # rejected = attempted & ~healthy
+                        rejected = np.logical_not(healthy, out=scratch)
+                        rejected &= harvest
+                        harvests_rejected += rejected
+                        if health_check.bypass_after is not None:
+                            # attempted harvests reset the streak unless they were rejected
+                            consecutive_rejections += rejected
+                            consecutive_rejections *= rejected | ~harvest
+                        harvest &= healthy
+                    elif health_check.bypass_after is not None:
+                        consecutive_rejections *= ~harvest
+                profit = np.maximum(pnl, 0.0)
+                profit *= harvest
+                loss = np.maximum(-pnl, 0.0)
+                loss *= harvest
+                management_fee = np.floor(debt * mgmt_rate * periods_since_report)
+
+        if harvest is None:
+            profit = np.maximum(gain, 0.0)
+            loss = np.maximum(-gain, 0.0)
+            management_fee = np.floor(debt * mgmt_rate)
+
+        strategist_fee = np.floor(profit * strategist_bps / VaultConstants.MAX_BPS)
+        performance_fee = np.floor(profit * vault_perf_bps / VaultConstants.MAX_BPS)
+        total_fee = np.where(profit > 0, np.minimum(management_fee + strategist_fee + performance_fee, np.floor(profit)), 0.0)
+        strategist_part = np.minimum(strategist_fee, total_fee)
+
+        net = gain - total_fee
+        if harvest is not None:
+            assets -= total_fee
+            np.maximum(assets, 0.0, out=assets)
+            np.copyto(debt, assets, where=harvest)
+            periods_since_report *= ~harvest
+            all_reported = bool(harvest.all())
+        else:
+            assets += net
+            np.maximum(assets, 0.0, out=assets)
+            debt = assets
+
+        vault_net = per_vault(net)
+        vault_gain = per_vault(profit)
+        vault_fees = per_vault(total_fee)
+        vault_loss = per_vault(loss)
+        vault_strategist = per_vault(strategist_part)
+        vault_assets = per_vault(assets)
+        # _calculateLockedProfit: linear unlock since the vault's last report
+        vault_periods_since_report += 1
+        decayed = locked_profit * np.maximum(1.0 - vault_periods_since_report * unlocked_per_period, 0.0)
+        updated = np.maximum(decayed + vault_gain - vault_fees - vault_loss, 0.0)
+        if harvest is not None:
+            # only vaults with at least one reported strategy update lockedProfit
+            reported = np.logical_or.reduceat(harvest, vault_starts, axis=1)
+            locked_profit = np.where(reported, updated, locked_profit)
+            vault_periods_since_report[reported] = 0
+        else:
+            locked_profit = updated
+            vault_periods_since_report[:] = 0
+
+        protocol_fees += vault_fees - vault_strategist
+        strategist_fees += vault_strategist
+        gross_gain += per_vault(gain)
+        in_loss = vault_net < 0
+        loss_periods += in_loss
+        opening = vault_assets - vault_net + idle
+        np.minimum(worst_period, vault_net / np.where(opening > 0, opening, 1.0), out=worst_period)
+        pair_losses += np.maximum(-gain, 0.0)
+        np.minimum(worst_protocol_period, vault_net.sum(axis=1), out=worst_protocol_period)
+        np.maximum(max_vaults_in_loss, in_loss.sum(axis=1), out=max_vaults_in_loss)
+
+        timeline[t + 1] = [
+            (vault_assets + idle).sum(axis=1).mean(),
+            (vault_fees - vault_strategist).sum(axis=1).mean(),
+            vault_strategist.sum(axis=1).mean(),
+            vault_net.sum(axis=1).mean(),
+        ]
+
+    final_assets = per_vault(assets) + idle
+    harvests_deferred = deferred_periods[:, None] * uses_oracle
+    final_locked_profit = locked_profit * np.maximum(1.0 - vault_periods_since_report * unlocked_per_period, 0.0)
+    unreported_pnl = per_vault(assets - debt)
+    strategy_losses = per_strategy(pair_losses)
+    protocol_total_fees = protocol_fees.sum(axis=1)
+    final_tvl = final_assets.sum(axis=1)
+
+    vault_df = pd.DataFrame({
+        'vault': [v.name for v in vaults],
+        'token': [v.token for v in vaults],
+        'tag': [v.tag for v in vaults],
+        'initial_assets': initial_assets,
+        'final_assets_mean': final_assets.mean(axis=0),
+        'final_assets_p5': np.percentile(final_assets, 5, axis=0),
+        'protocol_fees_mean': protocol_fees.mean(axis=0),
+        'strategist_fees_mean': strategist_fees.mean(axis=0),
+        'gross_gain_mean': gross_gain.mean(axis=0),
+        'loss_probability': loss_periods.mean(axis=0) / max(periods, 1),
+        'worst_period_return_mean': worst_period.mean(axis=0),
+        'locked_profit_mean': final_locked_profit.mean(axis=0),
+        'unreported_pnl_mean': unreported_pnl.mean(axis=0),
+        'harvests_rejected_mean': per_vault(harvests_rejected).mean(axis=0),
+        'harvests_deferred_mean': per_vault(harvests_deferred).mean(axis=0),
+    })
+
+    exposure = per_strategy(assets)  # (paths, strategies) across vaults
+    strategy_df = pd.DataFrame({
+        'strategy': [s.name for s in strategies],
+        'n_vaults': (ratios > 0).sum(axis=0),
+        'final_exposure_mean': exposure.mean(axis=0),
+        'total_losses_mean': strategy_losses.mean(axis=0),
+        'loss_share': strategy_losses.sum(axis=0) / max(strategy_losses.sum(), 1e-12),
+        'harvests_rejected_mean': per_strategy(harvests_rejected).mean(axis=0),
+        'harvests_deferred_mean': per_strategy(harvests_deferred).mean(axis=0),
+    })
+
+    timeline_df = pd.DataFrame(timeline, columns=['tvl_mean', 'protocol_fees_mean', 'strategist_fees_mean', 'net_gain_mean'])
+    timeline_df.insert(0, 'year', np.arange(periods + 1) / periods_per_year)
+    timeline_df.insert(0, 'period', np.arange(periods + 1))
+
+    summary = {
+        'n_vaults': n_vaults,
+        'n_paths': n_paths,
+        'initial_tvl': float(initial_assets.sum()),
+        'final_tvl_mean': float(final_tvl.mean()),
+        'final_tvl_p5': float(np.percentile(final_tvl, 5)),
+        'protocol_fees_mean': float(protocol_total_fees.mean()),
+        'protocol_fees_p5': float(np.percentile(protocol_total_fees, 5)),
+        'protocol_fees_p95': float(np.percentile(protocol_total_fees, 95)),
+        'strategist_fees_mean': float(strategist_fees.sum(axis=1).mean()),
+        'worst_period_protocol_loss_mean': float(worst_protocol_period.mean()),
+        'worst_period_protocol_loss_p1': float(np.percentile(worst_protocol_period, 1)),
+        'max_vaults_in_loss_mean': float(max_vaults_in_loss.mean()),
+        'harvest_attempts': n_paths * n_pairs * periods,  # over all paths, like the rates below
+        'harvests_rejected_rate': float(harvests_rejected.sum() / max(n_paths * n_pairs * periods, 1)),
+        'harvests_deferred_rate': float(harvests_deferred.sum() / max(n_paths * n_pairs * periods, 1)),
+        'unreported_pnl_mean': float(unreported_pnl.sum(axis=1).mean()),
+    }
+
+    return FleetSimResult(vaults=vault_df, strategies=strategy_df, timeline=timeline_df, summary=summary)
 
 # ---------------------------
 # Analytics helpers
@@ -366,6 +1277,9 @@ def visualize_simulation_to_pdf(result: VaultSimResult, strategies: List[Strateg
         text_buffer.write(f"Loss Probability: {s['loss_probability']*100:.2f}%\n")
         text_buffer.write(f"Fee Efficiency: {s['fee_efficiency']:.3f}\n")
         text_buffer.write(f"Avg period return: {s['avg_period_return']:.2f}, Std: {s['std_period_return']:.2f}\n")
+        if s.get('max_drawdown') is not None:
+            text_buffer.write(f"Max Drawdown: {s['max_drawdown']*100:.2f}%, Worst 30d Loss: {(s['worst_30d_loss'] or 0)*100:.2f}%\n")
+            text_buffer.write(f"Time Under Water: {s['time_under_water_periods']:.0f} periods (longest {s['longest_under_water_periods']:.0f})\n")
         if s['sharpe_annual_est'] is not None:
             text_buffer.write(f"Estimated Annual Sharpe: {s['sharpe_annual_est']:.2f}\n\n")
         text_buffer.write("Per-strategy configuration:\n")
@@ -480,6 +1394,11 @@ def generate_summary(result: VaultSimResult, strategies: List[StrategySpec], yea
     print(f"Loss Probability (periods with negative gross): {s['loss_probability']*100:.2f}%")
     print(f"Fee Efficiency (total fees / total gross gain): {s['fee_efficiency']:.3f}")
     print(f"Avg period return: {s['avg_period_return']:.2f}, Std period return: {s['std_period_return']:.2f}")
+    if s.get('max_drawdown') is not None:
+        print(f"Max drawdown: {s['max_drawdown']*100:.2f}%, worst 30-day loss: {(s['worst_30d_loss'] or 0)*100:.2f}%")
+        print(f"Time under water: {s['time_under_water_periods']:.0f} periods (longest spell {s['longest_under_water_periods']:.0f})")
+    if s.get('rolling_sharpe_min') is not None:
+        print(f"Rolling 1y Sharpe: min {s['rolling_sharpe_min']:.2f}, mean {s['rolling_sharpe_mean']:.2f}")
     if s['sharpe_annual_est'] is not None:
         print(f"Estimated annualized Sharpe (approx): {s['sharpe_annual_est']:.2f}")
     print("\nPer-strategy configuration:")
@@ -519,7 +1438,11 @@ if __name__ == "__main__":
     print("\n=== Snapshot (first 12 periods) ===")
     print(sim_result.timeline.head(12).T[[0,1,2,3,4,5]].T)  # wide but illustrative
 
-# 🔽 Add these lines 🔽
-import glob
-latest_pdf = sorted(glob.glob("vault_report_*.pdf"))[-1]
-files.download(latest_pdf)
+    # 🔽 Colab: download the latest report 🔽
+    try:
+        from google.colab import files
+    except ImportError:
+        files = None
+    reports = sorted(glob.glob("vault_report_*.pdf"))
+    if files is not None and reports:
+        files.download(reports[-1])
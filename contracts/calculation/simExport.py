@@ -0,0 +1,214 @@
+# =====================================================
+# Simulation output export / lazy load
+# Arrow IPC / Parquet (pyarrow) or memory-mapped .npy
+# =====================================================
+import json
+import math
+import os
+from dataclasses import asdict, is_dataclass
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_FILE = 'manifest.json'
+SCHEMA_VERSION = 1
+EXPORT_FORMATS = ('npy', 'arrow', 'parquet')
+METADATA_KEY = b'napy.simulation'
+
+# ---------------------------
+# Helpers
+# ---------------------------
+def _require_pyarrow(fmt):
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:
+        raise ImportError(f"format={fmt!r} needs pyarrow (pip install pyarrow); use format='npy' without it") from exc
+    return pa
+
+
+def to_jsonable(obj):
+    """Recursively convert dataclasses / numpy values into JSON-safe types (NaN -> None)."""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return to_jsonable(asdict(obj))
+    if isinstance(obj, dict):
+        return {str(k): to_jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_jsonable(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return to_jsonable(obj.tolist())
+    if isinstance(obj, np.generic):
+        return to_jsonable(obj.item())
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    return obj
+
+
+def _row_bounds(rows, n_rows):
+    if rows is None:
+        return 0, n_rows
+    start, stop, step = rows.indices(n_rows)
+    if step != 1:
+        raise ValueError("Row slices must be contiguous (step 1)")
+    return start, max(start, stop)
+
+# ---------------------------
+# Export
+# ---------------------------
+def _write_table(path, name, df, fmt, header, row_group_size):
+    if fmt == 'npy':
+        # one memory-mappable file per column
+        os.makedirs(os.path.join(path, name), exist_ok=True)
+        columns = []
+        for i, col in enumerate(df.columns):
+            values = df[col].to_numpy()
+            if values.dtype == object:
+                raise TypeError(f"Column {col!r} of table {name!r} is not numeric; npy export needs numeric columns")
+            file = os.path.join(name, f'col_{i}.npy')
+            np.save(os.path.join(path, file), values, allow_pickle=False)
+            columns.append({'name': str(col), 'file': file, 'dtype': str(values.dtype)})
+        return {'rows': len(df), 'columns': columns}
+
+    pa = _require_pyarrow(fmt)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), METADATA_KEY: json.dumps(header).encode()})
+    if fmt == 'arrow':
+        file = f'{name}.arrow'
+        with pa.OSFile(os.path.join(path, file), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=row_group_size)
+    else:
+        file = f'{name}.parquet'
+        pa.parquet.write_table(table, os.path.join(path, file), row_group_size=row_group_size)
+    return {
+        'rows': len(df),
+        'file': file,
+        'columns': [{'name': f.name, 'dtype': str(f.type)} for f in table.schema],
+    }
+
+
+def export_simulation(path, tables=None, arrays=None, metrics=None, metadata=None, format='npy', row_group_size=65536):
+    """
+    Write simulation outputs into directory `path`:
+    - tables: name -> DataFrame (timelines, per-path results), in `format`
+      ('npy': one .npy per column, 'arrow': Arrow IPC file, 'parquet')
+    - arrays: name -> ndarray, always .npy so they can be memory-mapped
+    - metrics / metadata: JSON-serialisable dicts (strategy specs, seed, parameters)
+    A manifest.json describes the schema; Arrow/Parquet files also carry the
+    metadata in their schema. Load back with load_simulation(path).
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {format!r}, expected one of {EXPORT_FORMATS}")
+    os.makedirs(path, exist_ok=True)
+
+    header = {
+        'schema_version': SCHEMA_VERSION,
+        'format': format,
+        'metadata': to_jsonable(metadata or {}),
+        'metrics': to_jsonable(metrics or {}),
+    }
+    manifest = dict(header, tables={}, arrays={})
+
+    for name, df in (tables or {}).items():
+        manifest['tables'][name] = _write_table(path, name, df, format, header, row_group_size)
+
+    for name, values in (arrays or {}).items():
+        values = np.asarray(values)
+        file = f'{name}.npy'
+        np.save(os.path.join(path, file), values, allow_pickle=False)
+        manifest['arrays'][name] = {'file': file, 'dtype': str(values.dtype), 'shape': list(values.shape)}
+
+    with open(os.path.join(path, MANIFEST_FILE), 'w') as fh:
+        json.dump(manifest, fh, indent=2)
+    return path
+
+# ---------------------------
+# Lazy load
+# ---------------------------
+class SimulationArchive:
+    """
+    Read side of export_simulation. Nothing is loaded up front: arrays come back
+    as read-only memory maps and tables are read per requested columns / rows.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE)) as fh:
+            self.manifest = json.load(fh)
+        if self.manifest.get('schema_version') != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported simulation archive version: {self.manifest.get('schema_version')}")
+
+    @property
+    def format(self):
+        return self.manifest['format']
+
+    @property
+    def metadata(self):
+        return self.manifest['metadata']
+
+    @property
+    def metrics(self):
+        return self.manifest['metrics']
+
+    @property
+    def tables(self):
+        return list(self.manifest['tables'])
+
+    @property
+    def arrays(self):
+        return list(self.manifest['arrays'])
+
+    def array(self, name):
+        """Memory-mapped (read-only) view of an exported array; slicing reads only what is touched."""
+        entry = self.manifest['arrays'][name]
+        return np.load(os.path.join(self.path, entry['file']), mmap_mode='r')
+
+    def arrow_table(self, name):
+        """Zero-copy pyarrow.Table over the memory-mapped file (arrow format only)."""
+        entry = self.manifest['tables'][name]
+        if self.format != 'arrow':
+            raise ValueError("arrow_table() is only available for format='arrow' archives")
+        pa = _require_pyarrow(self.format)
+        source = pa.memory_map(os.path.join(self.path, entry['file']), 'r')
+        return pa.ipc.open_file(source).read_all()
+
+    def table(self, name, columns=None, rows=None):
+        """
+        Load `columns` (default all) of table `name` for the contiguous row
+        slice `rows` (default all) as a DataFrame. Only the slice is materialized.
+        """
+        entry = self.manifest['tables'][name]
+        start, stop = _row_bounds(rows, entry['rows'])
+        wanted = columns if columns is not None else [c['name'] for c in entry['columns']]
+
+        if self.format == 'npy':
+            files = {c['name']: c['file'] for c in entry['columns']}
+            data = {}
+            for col in wanted:
+                values = np.load(os.path.join(self.path, files[col]), mmap_mode='r')
+                data[col] = np.array(values[start:stop])
+            return pd.DataFrame(data, columns=wanted)
+
+        if self.format == 'arrow':
+            return self.arrow_table(name).select(wanted).slice(start, stop - start).to_pandas()
+
+        pa = _require_pyarrow(self.format)
+        parquet_file = pa.parquet.ParquetFile(os.path.join(self.path, entry['file']), memory_map=True)
+        # read only the row groups overlapping [start, stop)
+        groups, offset, first_row = [], 0, None
+        for i in range(parquet_file.num_row_groups):
+            n = parquet_file.metadata.row_group(i).num_rows
+            if offset < stop and offset + n > start:
+                groups.append(i)
+                first_row = offset if first_row is None else first_row
+            offset += n
+        if not groups:
+            return parquet_file.schema_arrow.empty_table().select(wanted).to_pandas()
+        table = parquet_file.read_row_groups(groups, columns=wanted)
+        return table.slice(start - first_row, stop - start).to_pandas()
+
+
+def load_simulation(path):
+    """Open an export_simulation directory lazily."""
+    return SimulationArchive(path)
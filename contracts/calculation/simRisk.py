@@ -0,0 +1,79 @@
+# =====================================================
+# Path-wise risk metrics shared by the vault and
+# restake simulators (drawdown, under-water, rolling)
+# =====================================================
+import math
+from typing import Dict
+
+import numpy as np
+
+
+def path_risk_metrics(period_returns, loss_window: int, sharpe_window: int, periods_per_year: int) -> Dict[str, np.ndarray]:
+    """
+    Path-wise risk metrics for returns shaped (paths, periods) in one pass over time.
+    Only running state is kept per path (equity, peak, spell counters, sums) plus
+    ring buffers of the last `loss_window` / `sharpe_window` periods, so equity
+    curves are never materialized. Returns per-path arrays:
+    - max_drawdown: largest peak-to-trough fall of equity (fraction)
+    - time_under_water: periods spent below the running peak
+    - longest_under_water: longest consecutive spell below the peak
+    - worst_window_loss: worst compounded return over any `loss_window` periods
+    - rolling_sharpe_min / rolling_sharpe_mean: annualized Sharpe over `sharpe_window` periods
+    """
+    returns = np.atleast_2d(np.asarray(period_returns, dtype=float))
+    n_paths, n_periods = returns.shape
+    loss_window = max(1, min(loss_window, n_periods))
+    sharpe_window = max(2, sharpe_window)
+
+    equity = np.ones(n_paths)
+    peak = np.ones(n_paths)
+    max_drawdown = np.zeros(n_paths)
+    time_under_water = np.zeros(n_paths, dtype=np.int64)
+    spell = np.zeros(n_paths, dtype=np.int64)
+    longest_spell = np.zeros(n_paths, dtype=np.int64)
+    worst_window = np.full(n_paths, np.inf)
+    equity_buf = np.ones((loss_window, n_paths))  # equity at the start of each window
+    ret_buf = np.zeros((sharpe_window, n_paths))
+    ret_sum = np.zeros(n_paths)
+    ret_sq_sum = np.zeros(n_paths)
+    sharpe_min = np.full(n_paths, np.inf)
+    sharpe_sum = np.zeros(n_paths)
+    sharpe_count = 0
+
+    for t in range(n_periods):
+        r = returns[:, t]
+        equity *= 1.0 + r
+        np.maximum(peak, equity, out=peak)
+        np.maximum(max_drawdown, 1.0 - equity / peak, out=max_drawdown)
+
+        under = equity < peak
+        time_under_water += under
+        spell = (spell + 1) * under
+        np.maximum(longest_spell, spell, out=longest_spell)
+
+        slot = t % loss_window
+        if t >= loss_window - 1:
+            np.minimum(worst_window, equity / equity_buf[slot] - 1.0, out=worst_window)
+        equity_buf[slot] = equity
+
+        slot = t % sharpe_window
+        ret_sum += r - ret_buf[slot]
+        ret_sq_sum += r * r - ret_buf[slot] ** 2
+        ret_buf[slot] = r
+        if t >= sharpe_window - 1:
+            mean = ret_sum / sharpe_window
+            std = np.sqrt(np.maximum(ret_sq_sum / sharpe_window - mean ** 2, 0.0))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                sharpe = np.where(std > 0, mean / std, np.nan) * math.sqrt(periods_per_year)
+            np.fmin(sharpe_min, sharpe, out=sharpe_min)
+            sharpe_sum += np.nan_to_num(sharpe)
+            sharpe_count += 1
+
+    return {
+        'max_drawdown': max_drawdown,
+        'time_under_water': time_under_water,
+        'longest_under_water': longest_spell,
+        'worst_window_loss': np.where(np.isinf(worst_window), np.nan, worst_window),
+        'rolling_sharpe_min': np.where(np.isinf(sharpe_min), np.nan, sharpe_min),
+        'rolling_sharpe_mean': sharpe_sum / sharpe_count if sharpe_count else np.full(n_paths, np.nan),
+    }
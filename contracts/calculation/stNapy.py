@@ -1,9 +1,111 @@
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from scipy import stats
 import seaborn as sns
 
+from simExport import export_simulation
+from simRisk import path_risk_metrics
+
+class PathRetention:
+    """
+    Online, bounded retention of full per-strategy paths for drill-down.
+    Keeps a uniform reservoir of `reservoir_size` paths plus every path in each
+    requested tail, e.g. ('net_apy', 0.001, 'low') = worst 0.1% by net APY.
+    Selection happens batch by batch during generation (smallest-key merges:
+    random keys for the reservoir, scores for tails), so memory is bounded by
+    the number of kept paths and nothing needs to be re-simulated.
+    """
+    
+    SCORES = ('gross_apy', 'net_apy')
+    
+    def __init__(self, reservoir_size=100, tails=(('net_apy', 0.001, 'low'),), seed=None):
+        for metric, fraction, side in tails:
+            if metric not in self.SCORES:
+                raise ValueError(f"Unknown tail metric {metric!r}, expected one of {self.SCORES}")
+            if side not in ('low', 'high'):
+                raise ValueError(f"Tail side must be 'low' or 'high', got {side!r}")
+            if not 0 < fraction <= 1:
+                raise ValueError("Tail fraction must be in (0, 1]")
+        self.reservoir_size = reservoir_size
+        self.tails = list(tails)
+        # draw a seed when none is given so the selection can be reproduced
+        self.seed = np.random.SeedSequence().entropy if seed is None else seed
+        self.rng = np.random.default_rng(self.seed)
+        self.selections = None
+    
+    def begin(self, simulations, strategy_names):
+        """Size the selections for a run of `simulations` paths."""
+        self.strategy_names = list(strategy_names)
+        self.selections = {'reservoir': {'capacity': min(self.reservoir_size, simulations), 'key': None}}
+        for metric, fraction, side in self.tails:
+            name = f'{metric}_{side}_{fraction:g}'
+            self.selections[name] = {'capacity': max(1, int(np.ceil(fraction * simulations))),
+                                     'key': (metric, -1.0 if side == 'high' else 1.0)}
+        for selection in self.selections.values():
+            selection.update(keys=np.empty(0), index=np.empty(0, dtype=np.int64), returns=None,
+                             regimes=None, scores={metric: np.empty(0) for metric in self.SCORES})
+    
+    def update(self, start, strategy_returns, scores, regimes=None):
+        """
+        Offer one batch: strategy_returns (n_strategies, batch, days) as yielded by
+        generate_strategy_returns, scores {metric: (batch,)} for the same paths.
+        """
+        batch = strategy_returns.shape[1]
+        for selection in self.selections.values():
+            if selection['key'] is None:
+                batch_keys = self.rng.random(batch)
+            else:
+                metric, sign = selection['key']
+                batch_keys = sign * scores[metric]
+            self._merge(selection, start, batch_keys, strategy_returns, scores, regimes)
+    
+    def _merge(self, selection, start, batch_keys, strategy_returns, scores, regimes):
+        capacity = selection['capacity']
+        kept = len(selection['keys'])
+        if capacity == 0:
+            return
+        # once full, only paths beating the current worst kept key can enter
+        candidates = np.arange(len(batch_keys))
+        if kept == capacity:
+            candidates = candidates[batch_keys < selection['keys'].max()]
+            if candidates.size == 0:
+                return
+        
+        all_keys = np.concatenate([selection['keys'], batch_keys[candidates]])
+        if len(all_keys) > capacity:
+            chosen = np.argpartition(all_keys, capacity - 1)[:capacity]
+        else:
+            chosen = np.arange(len(all_keys))
+        old = chosen[chosen < kept]
+        new = candidates[chosen[chosen >= kept] - kept]
+        
+        new_returns = np.moveaxis(strategy_returns[:, new, :], 1, 0)  # (paths, n_strategies, days)
+        selection['returns'] = new_returns if selection['returns'] is None else \
+            np.concatenate([selection['returns'][old], new_returns])
+        if regimes is not None:
+            selection['regimes'] = regimes[new] if selection['regimes'] is None else \
+                np.concatenate([selection['regimes'][old], regimes[new]])
+        selection['keys'] = np.concatenate([selection['keys'][old], batch_keys[new]])
+        selection['index'] = np.concatenate([selection['index'][old], start + new])
+        for metric in self.SCORES:
+            selection['scores'][metric] = np.concatenate([selection['scores'][metric][old], scores[metric][new]])
+    
+    def result(self):
+        """
+        Retained paths per selection, ordered by simulation index:
+        {name: {'index', 'returns' (paths, n_strategies, days), 'regimes', 'scores'}}
+        """
+        out = {'strategy_names': self.strategy_names}
+        for name, selection in self.selections.items():
+            order = np.argsort(selection['index'])
+            out[name] = {
+                'index': selection['index'][order],
+                'returns': None if selection['returns'] is None else selection['returns'][order],
+                'regimes': None if selection['regimes'] is None else selection['regimes'][order],
+                'scores': {metric: values[order] for metric, values in selection['scores'].items()}
+            }
+        return out
+
 class RestakeStrategySimulator:
     def __init__(self):
         self.strategies = {
@@ -12,6 +114,10 @@ class RestakeStrategySimulator:
                 'mean_return': 0.085,
                 'std_dev': 0.03,
                 'perf_fee': 0.10,
+                'jump_intensity': 0.5,   # expected jumps per year (calm regime)
+                'jump_mean': -0.010,
+                'jump_std': 0.010,
+                'depeg_beta': 1.0,       # exposure to the depeg regime drift
                 'description': 'Main EigenLayer yield + base staking'
             },
             'LRTBoost': {
@@ -19,6 +125,10 @@ class RestakeStrategySimulator:
                 'mean_return': 0.045,
                 'std_dev': 0.02,
                 'perf_fee': 0.12,
+                'jump_intensity': 0.8,
+                'jump_mean': -0.015,
+                'jump_std': 0.020,
+                'depeg_beta': 1.2,
                 'description': 'Rewards and restake points yield layer'
             },
             'PendleYield': {
@@ -26,6 +136,10 @@ class RestakeStrategySimulator:
                 'mean_return': 0.035,
                 'std_dev': 0.05,
                 'perf_fee': 0.15,
+                'jump_intensity': 0.3,
+                'jump_mean': -0.005,
+                'jump_std': 0.010,
+                'depeg_beta': 0.5,
                 'description': 'Yield swap / Pendle market neutral returns'
             },
             'Idle': {
@@ -33,21 +147,61 @@ class RestakeStrategySimulator:
                 'mean_return': 0.00,
                 'std_dev': 0.00,
                 'perf_fee': 0.00,
+                'jump_intensity': 0.0,
+                'jump_mean': 0.0,
+                'jump_std': 0.0,
+                'depeg_beta': 0.0,
                 'description': 'Vault idle balance'
             }
         }
+
+        # Market regimes for regime-switching simulations (daily parameters).
+        # correlation=None means "use the base correlation matrix".
+        self.regimes = {
+            'calm': {
+                'vol_scale': 1.0,
+                'jump_scale': 1.0,
+                'depeg_drift': 0.0,
+                'correlation': None
+            },
+            'stress': {
+                'vol_scale': 2.0,
+                'jump_scale': 3.0,
+                'depeg_drift': -0.0001,
+                'correlation': np.array([
+                    [1.0, 0.6, 0.5],
+                    [0.6, 1.0, 0.4],
+                    [0.5, 0.4, 1.0]
+                ])
+            },
+            'depeg': {
+                'vol_scale': 4.0,
+                'jump_scale': 10.0,
+                'depeg_drift': -0.0010,
+                'correlation': np.array([
+                    [1.0, 0.9, 0.7],
+                    [0.9, 1.0, 0.6],
+                    [0.7, 0.6, 1.0]
+                ])
+            }
+        }
+        # Daily Markov transition probabilities, rows/cols in self.regimes order
+        self.regime_transition = np.array([
+            [0.990, 0.009, 0.001],  # calm -> calm / stress / depeg
+            [0.050, 0.940, 0.010],  # stress
+            [0.080, 0.120, 0.800]   # depeg
+        ])
         
         # Validate debt ratios sum to 100%
         total_ratio = sum(strategy['debt_ratio'] for strategy in self.strategies.values())
         assert abs(total_ratio - 1.0) < 0.001, f"Debt ratios must sum to 100%, got {total_ratio*100}%"
     
-    def simulate_returns(self, days=365, simulations=10000, correlation_matrix=None):
+    def _daily_parameters(self, correlation_matrix=None):
         """
-        Simulate daily returns for the portfolio
+        Daily means / vols / weights for the non-idle strategies
         """
-        n_strategies = len(self.strategies) - 1  # Exclude Idle
         strategy_names = [name for name in self.strategies.keys() if name != 'Idle']
-        
+
         # Default correlation matrix (assuming low correlation between strategies)
         if correlation_matrix is None:
             correlation_matrix = np.array([
@@ -55,12 +209,12 @@ class RestakeStrategySimulator:
                 [0.3, 1.0, 0.1],  # LRTBoost correlations
                 [0.2, 0.1, 1.0]   # PendleYield correlations
             ])
-        
+
         # Convert annual to daily parameters
         daily_means = []
         daily_volatilities = []
         weights = []
-        
+
         for name in strategy_names:
             strategy = self.strategies[name]
             daily_mean = (1 + strategy['mean_return']) ** (1/365) - 1
@@ -68,32 +222,179 @@ class RestakeStrategySimulator:
             daily_means.append(daily_mean)
             daily_volatilities.append(daily_vol)
             weights.append(strategy['debt_ratio'])
-        
-        weights = np.array(weights)
-        
-        # Generate correlated returns
-        cov_matrix = np.outer(daily_volatilities, daily_volatilities) * correlation_matrix
-        L = np.linalg.cholesky(cov_matrix)
-        
-        portfolio_returns = np.zeros((simulations, days))
+
+        return strategy_names, np.array(daily_means), np.array(daily_volatilities), np.array(weights), correlation_matrix
+
+    def _regime_tables(self, strategy_names, daily_volatilities, correlation_matrix):
+        """
+        Precompute per-regime Cholesky factors, daily jump probabilities and drifts
+        so path generation is pure table lookups
+        """
+        n_regimes = len(self.regimes)
+        n_strategies = len(strategy_names)
+        chol = np.empty((n_regimes, n_strategies, n_strategies))
+        jump_prob = np.empty((n_regimes, n_strategies))
+        drift = np.empty((n_regimes, n_strategies))
+
+        jump_intensity = np.array([self.strategies[name]['jump_intensity'] for name in strategy_names])
+        depeg_beta = np.array([self.strategies[name]['depeg_beta'] for name in strategy_names])
+
+        for k, (regime_name, regime) in enumerate(self.regimes.items()):
+            corr = correlation_matrix if regime['correlation'] is None else np.asarray(regime['correlation'])
+            if corr.shape != (n_strategies, n_strategies):
+                raise ValueError(
+                    f"Correlation matrix for regime '{regime_name}' has shape {corr.shape}, "
+                    f"expected ({n_strategies}, {n_strategies}) for strategies {strategy_names}"
+                )
+            vols = daily_volatilities * regime['vol_scale']
+            chol[k] = np.linalg.cholesky(np.outer(vols, vols) * corr)
+            # expected jumps per strategy per day; a path-day can receive several
+            # jumps (positions are drawn with replacement), like a Poisson process
+            jump_prob[k] = np.minimum(jump_intensity * regime['jump_scale'] / 365, 1.0)
+            drift[k] = depeg_beta * regime['depeg_drift']
+
+        cum_transition = np.cumsum(self.regime_transition, axis=1)
+        cum_transition[:, -1] = 1.0
+        return chol, jump_prob, drift, cum_transition
+
+    def simulate_regime_paths(self, simulations, days, rng=None, cum_transition=None, initial_regime=0):
+        """
+        Markov regime paths, shape (simulations, days), values index self.regimes.
+        One uniform draw per path-day and a cumulative transition table lookup.
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        if cum_transition is None:
+            cum_transition = np.cumsum(self.regime_transition, axis=1)
+            cum_transition[:, -1] = 1.0
+
+        # day-major so each step touches contiguous memory
+        u = rng.random((days, simulations))
+        regimes = np.empty((days, simulations), dtype=np.int8)
+        state = np.full(simulations, initial_regime, dtype=np.int8)
+        thresholds = [cum_transition[:, k] for k in range(cum_transition.shape[1] - 1)]
+        threshold_buf = np.empty(simulations)
+        crossed = np.empty(simulations, dtype=bool)
+        for day in range(days):
+            # next state = number of cumulative thresholds of the current row crossed
+            next_state = regimes[day]
+            np.take(thresholds[0], state, out=threshold_buf)
+            np.greater(u[day], threshold_buf, out=next_state.view(bool))
+            for threshold in thresholds[1:]:
+                np.take(threshold, state, out=threshold_buf)
+                next_state += np.greater(u[day], threshold_buf, out=crossed)
+            state = next_state
+        return np.ascontiguousarray(regimes.T)
+
+    def generate_strategy_returns(self, days=365, simulations=10000, correlation_matrix=None,
+                                  shocks='gaussian', t_dof=4.0, regime_switching=False, jumps=False,
+                                  seed=None, batch_size=50000):
+        """
+        Yield (start, strategy_returns, regimes) batches of daily per-strategy returns.
+        strategy_returns is strategy-major, shaped (n_strategies, batch, days); regimes
+        is (batch, days) or None unless regime_switching. Batching bounds memory for
+        million-path runs.
+
+        shocks: 'gaussian' or 'student_t' (multivariate t: one shared chi-square
+            mixing draw per path-day, rescaled to unit variance)
+        regime_switching: Markov calm/stress/depeg regimes with regime-dependent
+            vols, correlations, jump intensities and depeg drift. Costs about
+            1.5x the Gaussian path (200k paths x 365 days), mostly the day-by-day
+            Markov chain; returns are mixed only on the non-calm path-days.
+        jumps: add jump shocks (per-strategy jump_intensity/jump_mean/jump_std, per year)
+        """
+        if shocks not in ('gaussian', 'student_t'):
+            raise ValueError(f"Unknown shock distribution: {shocks}")
+        if shocks == 'student_t' and t_dof <= 2:
+            raise ValueError("Student-t shocks need t_dof > 2 for a finite variance")
+
+        rng = np.random.default_rng(seed)
+        strategy_names, daily_means, daily_volatilities, _, correlation_matrix = self._daily_parameters(correlation_matrix)
+        n_strategies = len(strategy_names)
+        if regime_switching:
+            chol, jump_prob, drift, cum_transition = self._regime_tables(strategy_names, daily_volatilities, correlation_matrix)
+        base_chol = np.linalg.cholesky(np.outer(daily_volatilities, daily_volatilities) * correlation_matrix)
+        base_jump_prob = np.minimum(np.array([self.strategies[name]['jump_intensity'] for name in strategy_names]) / 365, 1.0)
+        jump_mean = np.array([self.strategies[name]['jump_mean'] for name in strategy_names])
+        jump_std = np.array([self.strategies[name]['jump_std'] for name in strategy_names])
+
+        for start in range(0, simulations, batch_size):
+            size = min(batch_size, simulations - start)
+
+            # Generate uncorrelated unit-variance shocks
+            Z = rng.standard_normal((n_strategies, size, days))
+            if shocks == 'student_t':
+                chi2 = 2.0 * rng.standard_gamma(t_dof / 2, (size, days))
+                Z *= np.sqrt((t_dof - 2) / chi2)
+
+            if regime_switching:
+                regimes = self.simulate_regime_paths(size, days, rng, cum_transition)
+                # Transform to correlated returns with the base (calm) regime's covariance
+                # in one product, then redo only the path-days spent in other regimes
+                returns = np.tensordot(chol[0], Z, axes=1)
+                returns += (daily_means + drift[0])[:, None, None]
+                moved = np.flatnonzero(regimes)
+                if moved.size:
+                    regime = regimes.reshape(-1)[moved]
+                    flat_returns = returns.reshape(n_strategies, -1)
+                    flat_Z = Z.reshape(n_strategies, -1)
+                    for k in range(1, len(self.regimes)):
+                        days_k = moved[regime == k]
+                        if days_k.size:
+                            flat_returns[:, days_k] = chol[k] @ flat_Z[:, days_k] + (daily_means + drift[k])[:, None]
+            else:
+                regimes = None
+                returns = np.tensordot(base_chol, Z, axes=1)
+                returns += daily_means[:, None, None]
+
+            if jumps:
+                # Jump positions are drawn (with replacement, so jumps can stack on a
+                # path-day) at the highest regime intensity and thinned to the actual
+                # regime's, so cost scales with jumps, not path-days
+                max_jump_prob = jump_prob.max(axis=0) if regime_switching else base_jump_prob
+                for i in range(n_strategies):
+                    n_candidates = rng.binomial(size * days, max_jump_prob[i])
+                    if n_candidates == 0:
+                        continue
+                    flat = rng.integers(0, size * days, n_candidates)
+                    if regime_switching:
+                        keep = rng.random(n_candidates) * max_jump_prob[i] < jump_prob[regimes.ravel()[flat], i]
+                        flat = flat[keep]
+                    np.add.at(returns[i].reshape(-1), flat, jump_mean[i] + jump_std[i] * rng.standard_normal(flat.size))
+
+            yield start, returns, regimes
+
+    def simulate_returns(self, days=365, simulations=10000, correlation_matrix=None, retention=None, **return_model):
+        """
+        Simulate daily returns for the portfolio.
+        return_model is forwarded to generate_strategy_returns (shocks, t_dof,
+        regime_switching, jumps, seed, batch_size); the default is correlated Gaussians.
+        retention: optional PathRetention fed each batch to keep full per-strategy
+        paths (reservoir + tails) for drill-down.
+        """
+        strategy_names, _, _, weights, _ = self._daily_parameters(correlation_matrix)
+        if retention is not None:
+            retention.begin(simulations, strategy_names)
+
+        portfolio_returns = np.empty((simulations, days))
         strategy_returns_detailed = {}
-        
-        for i in range(simulations):
-            # Generate uncorrelated random shocks
-            Z = np.random.normal(0, 1, (n_strategies, days))
-            # Transform to correlated returns
-            correlated_returns = daily_means[:, None] + L @ Z
-            
+
+        for start, strategy_returns, regimes in self.generate_strategy_returns(days, simulations, correlation_matrix, **return_model):
             # Calculate portfolio returns (weighted sum)
-            for day in range(days):
-                daily_portfolio_return = np.sum(weights * correlated_returns[:, day])
-                portfolio_returns[i, day] = daily_portfolio_return
+            batch_returns = np.tensordot(weights, strategy_returns, axes=1)
+            portfolio_returns[start:start + strategy_returns.shape[1]] = batch_returns
             
+            if retention is not None:
+                scores = {
+                    'gross_apy': (1 + batch_returns).prod(axis=1) - 1,
+                    'net_apy': (1 + self.apply_performance_fees(batch_returns)).prod(axis=1) - 1
+                }
+                retention.update(start, strategy_returns, scores, regimes)
+
             # Store detailed returns for one simulation for analysis
-            if i == 0:
+            if start == 0:
                 for j, name in enumerate(strategy_names):
-                    strategy_returns_detailed[name] = correlated_returns[j]
-        
+                    strategy_returns_detailed[name] = strategy_returns[j, 0].copy()
+
         return portfolio_returns, strategy_returns_detailed
     
     def apply_performance_fees(self, gross_returns):
@@ -136,17 +437,45 @@ class RestakeStrategySimulator:
         metrics['prob_above_10'] = (annual_returns > 0.10).mean() * 100
         metrics['prob_above_12'] = (annual_returns > 0.12).mean() * 100
         
+        # Path-wise risk (drawdown, time under water, worst 30d loss, rolling Sharpe)
+        risk = self.calculate_path_risk_metrics(portfolio_returns)
+        # Keys name the cross-path statistic: _mean / _median over paths, _p95 / _p5
+        # the tail percentile, _min the single worst path.
+        metrics['max_drawdown_mean'] = np.mean(risk['max_drawdown']) * 100
+        metrics['max_drawdown_p95'] = np.percentile(risk['max_drawdown'], 95) * 100
+        metrics['time_under_water_days_mean'] = np.mean(risk['time_under_water'])
+        metrics['longest_under_water_days_mean'] = np.mean(risk['longest_under_water'])
+        metrics['worst_30d_loss_mean'] = np.nanmean(risk['worst_window_loss']) * 100
+        metrics['worst_30d_loss_p5'] = np.nanpercentile(risk['worst_window_loss'], 5) * 100
+        metrics['worst_30d_loss_min'] = np.nanmin(risk['worst_window_loss']) * 100
+        metrics['rolling_sharpe_30d_min'] = np.nanmin(risk['rolling_sharpe_min'])
+        metrics['rolling_sharpe_30d_min_median'] = np.nanmedian(risk['rolling_sharpe_min'])
+        metrics['rolling_sharpe_30d_mean'] = np.nanmean(risk['rolling_sharpe_mean'])
+        
         return metrics, annual_returns
     
-    def run_monte_carlo_analysis(self, simulations=50000, days=365):
+    def calculate_path_risk_metrics(self, portfolio_returns, loss_window=30, sharpe_window=30):
+        """
+        Per-path max drawdown, time under water, worst `loss_window`-day loss and
+        rolling `sharpe_window`-day annualized Sharpe (see simRisk.path_risk_metrics)
+        """
+        return path_risk_metrics(portfolio_returns, loss_window, sharpe_window, periods_per_year=365)
+    
+    def run_monte_carlo_analysis(self, simulations=50000, days=365, retention=None, **return_model):
         """
         Run comprehensive Monte Carlo simulation
+        (return_model: see generate_strategy_returns, default Gaussian;
+        retention: optional PathRetention, its result lands in 'retained_paths')
         """
         print("🚀 Running Restake Aggregator Vault Simulation...")
         print("=" * 60)
         
+        # Always run from a recorded seed so exported results can be reproduced
+        if return_model.get('seed') is None:
+            return_model['seed'] = np.random.SeedSequence().entropy
+        
         # Simulate returns
-        gross_returns, detailed_returns = self.simulate_returns(days=days, simulations=simulations)
+        gross_returns, detailed_returns = self.simulate_returns(days=days, simulations=simulations, retention=retention, **return_model)
         
         # Apply fees
         net_returns = self.apply_performance_fees(gross_returns)
@@ -155,13 +484,58 @@ class RestakeStrategySimulator:
         gross_metrics, gross_annual = self.calculate_portfolio_metrics(gross_returns)
         net_metrics, net_annual = self.calculate_portfolio_metrics(net_returns)
         
-        return {
+        results = {
             'gross': gross_metrics,
             'net': net_metrics,
             'gross_annual_returns': gross_annual,
             'net_annual_returns': net_annual,
-            'detailed_returns': detailed_returns
+            'detailed_returns': detailed_returns,
+            'parameters': {'simulations': simulations, 'days': days, **return_model}
+        }
+        if retention is not None:
+            results['parameters']['retention_seed'] = retention.seed
+        if retention is not None:
+            results['retained_paths'] = retention.result()
+        return results
+    
+    def export_results(self, results, path, format='npy'):
+        """
+        Export run_monte_carlo_analysis results: per-path annual returns and the
+        detailed strategy path as tables, gross/net metrics, and strategy /
+        regime configuration plus run parameters (seed, model) as metadata.
+        Reload lazily with simExport.load_simulation(path).
+        """
+        paths = pd.DataFrame({
+            'gross_annual_return': results['gross_annual_returns'],
+            'net_annual_return': results['net_annual_returns']
+        })
+        tables = {'paths': paths}
+        if results.get('detailed_returns'):
+            tables['detailed_returns'] = pd.DataFrame(results['detailed_returns'])
+        
+        metadata = {
+            'kind': 'restake_monte_carlo',
+            'strategies': self.strategies,
+            'regimes': self.regimes,
+            'regime_transition': self.regime_transition,
+            'parameters': results.get('parameters', {})
         }
+        # retained drill-down paths go out as memory-mappable arrays
+        arrays = {}
+        retained = results.get('retained_paths')
+        if retained is not None:
+            metadata['retained_strategy_names'] = retained['strategy_names']
+            for name, selection in retained.items():
+                if name == 'strategy_names' or selection['returns'] is None:
+                    continue
+                arrays[f'retained_{name}_index'] = selection['index']
+                arrays[f'retained_{name}_returns'] = selection['returns']
+                if selection['regimes'] is not None:
+                    arrays[f'retained_{name}_regimes'] = selection['regimes']
+                tables[f'retained_{name}_scores'] = pd.DataFrame({'index': selection['index'], **selection['scores']})
+        
+        metrics = {'gross': results['gross'], 'net': results['net']}
+        return export_simulation(path, tables=tables, arrays=arrays, metrics=metrics, metadata=metadata, format=format)
     
     def plot_results(self, results):
         """
@@ -268,7 +642,15 @@ class RestakeStrategySimulator:
             ["Volatility", f"{results['gross']['std_apy']:.2f}%", f"{results['net']['std_apy']:.2f}%", "—"],
             ["Sharpe Ratio", f"{results['gross']['sharpe_ratio']:.2f}", f"{results['net']['sharpe_ratio']:.2f}", "—"],
             ["5% VaR", f"{results['gross']['var_95']:.2f}%", f"{results['net']['var_95']:.2f}%", "—"],
-            ["5% CVaR", f"{results['gross']['cvar_95']:.2f}%", f"{results['net']['cvar_95']:.2f}%", "—"]
+            ["5% CVaR", f"{results['gross']['cvar_95']:.2f}%", f"{results['net']['cvar_95']:.2f}%", "—"],
+            ["Mean Max DD", f"{results['gross']['max_drawdown_mean']:.2f}%", f"{results['net']['max_drawdown_mean']:.2f}%", "—"],
+            ["95% Max DD", f"{results['gross']['max_drawdown_p95']:.2f}%", f"{results['net']['max_drawdown_p95']:.2f}%", "—"],
+            ["Underwater Days", f"{results['gross']['time_under_water_days_mean']:.1f}", f"{results['net']['time_under_water_days_mean']:.1f}", "—"],
+            ["Mean 30d Loss", f"{results['gross']['worst_30d_loss_mean']:.2f}%", f"{results['net']['worst_30d_loss_mean']:.2f}%", "—"],
+            ["5% 30d Loss", f"{results['gross']['worst_30d_loss_p5']:.2f}%", f"{results['net']['worst_30d_loss_p5']:.2f}%", "—"],
+            ["Worst 30d Loss", f"{results['gross']['worst_30d_loss_min']:.2f}%", f"{results['net']['worst_30d_loss_min']:.2f}%", "—"],
+            ["Med 30d SR Min", f"{results['gross']['rolling_sharpe_30d_min_median']:.2f}", f"{results['net']['rolling_sharpe_30d_min_median']:.2f}", "—"],
+            ["30d Sharpe Min", f"{results['gross']['rolling_sharpe_30d_min']:.2f}", f"{results['net']['rolling_sharpe_30d_min']:.2f}", "—"]
         ]
         
         for row in portfolio_metrics: